@@ -1,14 +1,32 @@
 import streamlit as st
+import pandas as pd
 import datetime
 import random
 import json
+import logging
+import mmap
+import os
+import threading
+import time
+import atexit
 import uuid
-from collections import defaultdict
+from collections import Counter, defaultdict
+from itertools import islice, takewhile
+from operator import itemgetter
 from streamlit_option_menu import option_menu
 from typing import Dict, List, Optional
 
+try:
+    import orjson
+except ImportError:  # fall back to the stdlib encoder/decoder
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
 # Constants
 DATA_FILE = "app_data.json"
+SAVE_DELAY = 0.5  # seconds to coalesce mutations before writing
+POSTS_PER_PAGE = 20
 GROWTH_QUOTES = [
     "The only limit to our realization of tomorrow will be our doubts of today. - Franklin D. Roosevelt",
     "Becoming is better than being. - Carol Dweck",
@@ -24,6 +42,14 @@ DAILY_CHALLENGES = {
         "Tackle a problem outside your comfort zone"
     ]
 }
+CHALLENGE_LEVELS = list(DAILY_CHALLENGES.keys())
+MENU_OPTIONS = ["Dashboard", "Daily Challenge", "Progress Tracker",
+                "Reflection Journal", "Community Wall", "Resources"]
+MENU_ICONS = ['house', 'clock', 'graph-up', 'journal', 'people', 'book']
+MENU_STYLES = {
+    "container": {"padding": "5px"},
+    "nav-link": {"font-size": "16px"}
+}
 
 # Data Models
 class JournalEntry:
@@ -44,85 +70,218 @@ class CommunityPost:
         self.likes = 0
 
 # Data Persistence
+@st.cache_resource
 def load_data() -> Dict:
     try:
-        with open(DATA_FILE, "r") as f:
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        return {
+        data = _read_data()
+    except FileNotFoundError:
+        data = None
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        # Keep the unreadable file instead of letting the writer overwrite it
+        corrupt_file = DATA_FILE + ".corrupt"
+        os.replace(DATA_FILE, corrupt_file)
+        logger.error("Could not parse %s; moved it to %s", DATA_FILE, corrupt_file)
+        data = None
+    if data is None:
+        data = {
             "journal_entries": [],
             "completed_challenges": [],
             "community_posts": [],
             "users": {}
         }
+    _index_data(data)
+    return data
+
+def _read_data() -> Optional[Dict]:
+    # Returns None for an empty file, which also can't be mapped
+    if orjson:
+        with open(DATA_FILE, "rb") as f:
+            if not os.fstat(f.fileno()).st_size:
+                return None
+            # Parse straight from the mapped file instead of copying it into bytes first
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, \
+                    memoryview(mm) as view:
+                return orjson.loads(view)
+    with open(DATA_FILE, "r", encoding="utf-8") as f:
+        if not os.fstat(f.fileno()).st_size:
+            return None
+        return json.load(f)
+
+def _index_data(data: Dict) -> None:
+    # Keys starting with "_" are in-memory indexes and are never saved
+    data["_challenges_by_user"] = defaultdict(list)
+    for challenge in data["completed_challenges"]:
+        data["_challenges_by_user"][challenge["user"]].append(challenge)
+    # Entries and posts are saved as lists but kept in memory keyed by id
+    data["journal_entries"] = {e["id"]: e for e in data["journal_entries"]}
+    data["_entries_by_user"] = defaultdict(dict)
+    for entry in data["journal_entries"].values():
+        entry["_lc"] = entry_search_text(entry)
+        entry["_tags_str"] = ", ".join(entry["tags"])
+        data["_entries_by_user"][entry["user"]][entry["id"]] = entry
+    posts = data["community_posts"]
+    for post in posts:
+        post["_lc"] = post["content"].lower()
+        post["_ts"] = int(datetime.datetime.fromisoformat(post["date"]).timestamp())
+    # Keep posts in chronological order so rendering can walk them backwards
+    posts.sort(key=itemgetter("_ts"))
+    data["community_posts"] = {p["id"]: p for p in posts}
+
+def _public(record: Dict) -> Dict:
+    return {k: v for k, v in record.items() if not k.startswith("_")}
+
+def _serializable(data: Dict) -> Dict:
+    serializable = _public(data)
+    for key in ("journal_entries", "community_posts"):
+        serializable[key] = [_public(r) for r in list(data[key].values())]
+    return serializable
+
+class DataWriter:
+    # Cached with st.cache_resource so every rerun shares one flag and lock;
+    # module globals are recreated each time Streamlit re-executes the script
+    def __init__(self, data: Dict):
+        self.data = data
+        self.dirty = threading.Event()
+        self.lock = threading.Lock()
+
+def _write_data(writer: DataWriter) -> None:
+    tmp_file = DATA_FILE + ".tmp"
+    with writer.lock:
+        if orjson:
+            with open(tmp_file, "wb") as f:
+                f.write(orjson.dumps(_serializable(writer.data)))
+        else:
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump(_serializable(writer.data), f)
+        os.replace(tmp_file, DATA_FILE)
+
+def _flush_data(writer: DataWriter) -> None:
+    if writer.dirty.is_set():
+        writer.dirty.clear()
+        _write_data(writer)
+
+def _writer_loop(writer: DataWriter) -> None:
+    while True:
+        writer.dirty.wait()
+        time.sleep(SAVE_DELAY)
+        try:
+            _flush_data(writer)
+        except Exception:
+            # Keep the writer alive and retry on the next cycle
+            logger.exception("Failed to save %s", DATA_FILE)
+            writer.dirty.set()
+
+@st.cache_resource
+def _start_writer(_data: Dict) -> DataWriter:
+    writer = DataWriter(_data)
+    threading.Thread(target=_writer_loop, args=(writer,), daemon=True).start()
+    atexit.register(_flush_data, writer)
+    return writer
 
 def save_data(data: Dict) -> None:
-    with open(DATA_FILE, "w") as f:
-        json.dump(data, f, indent=2)
+    # Mark the shared store dirty; the writer thread batches the disk write
+    _start_writer(data).dirty.set()
+
+def get_user_challenges(data: Dict, username: str) -> List[Dict]:
+    return data["_challenges_by_user"].get(username, [])
+
+def get_user_entries(data: Dict, username: str) -> Dict[str, Dict]:
+    return data["_entries_by_user"].get(username, {})
 
 # Utility Functions
+def entry_search_text(entry: Dict) -> str:
+    # The single-line search box can't produce "\n", so matches never span both fields
+    return f"{entry['reflection']}\n{entry['lessons']}".lower()
+
 def calculate_streak(dates: List[str]) -> int:
     if not dates:
         return 0
     
-    sorted_dates = sorted([datetime.date.fromisoformat(d) for d in dates])
-    streak = 1
-    current_date = datetime.date.today()
+    date_set = {datetime.date.fromisoformat(d) for d in dates}
+    current_date = max(date_set)
+    one_day = datetime.timedelta(days=1)
+    if datetime.date.today() - current_date > one_day:
+        return 0
     
-    for date in reversed(sorted_dates):
-        if date == current_date:
-            continue
-        if current_date - date == datetime.timedelta(days=1):
-            streak += 1
-            current_date = date
-        else:
-            break
+    streak = 1
+    while current_date - one_day in date_set:
+        streak += 1
+        current_date -= one_day
     return streak
 
-def get_weekly_progress() -> Dict[str, int]:
-    data = load_data()
-    challenges = data["completed_challenges"]
-    
-    progress = defaultdict(int)
+@st.cache_data(ttl=86400)
+def quote_of_day(day: str) -> str:
+    return random.choice(GROWTH_QUOTES)
+
+def get_user_record(data: Dict, username: str) -> Dict:
+    user = data["users"].setdefault(username, {"joined": datetime.date.today().isoformat()})
+    if "streak" not in user:
+        # One-time migration for users created before streaks were stored
+        dates = [c["date"] for c in get_user_challenges(data, username)]
+        user["streak"] = calculate_streak(dates)
+        user["last_date"] = max(dates) if dates else None
+        save_data(data)
+    return user
+
+def update_streak(user: Dict, today: datetime.date) -> None:
+    last_date = user.get("last_date")
+    if last_date == (today - datetime.timedelta(days=1)).isoformat():
+        user["streak"] += 1
+    elif last_date != today.isoformat():
+        user["streak"] = 1
+    user["last_date"] = today.isoformat()
+
+def current_streak(user: Dict) -> int:
     today = datetime.date.today()
+    if user["last_date"] in (today.isoformat(), (today - datetime.timedelta(days=1)).isoformat()):
+        return user["streak"]
+    return 0
+
+@st.cache_data(ttl=300)
+def get_weekly_progress(_data: Dict, username: str, today_iso: str) -> Dict[str, int]:
+    challenges = get_user_challenges(_data, username)
+    today = datetime.date.fromisoformat(today_iso)
+    days = [(today - datetime.timedelta(days=i)).isoformat() for i in range(6, -1, -1)]
     
-    for i in range(7):
-        date = today - datetime.timedelta(days=i)
-        progress[date.isoformat()] = 0
-    
-    for challenge in challenges:
-        date = challenge["date"]
-        progress[date] += 1
-    
-    return progress
+    # Challenges are appended as they are completed, so stop at the first one before the window
+    recent = takewhile(lambda c: c["date"] >= days[0], reversed(challenges))
+    counts = Counter(c["date"] for c in recent)
+    return {day: counts[day] for day in days}
+
+@st.cache_data(ttl=300)
+def weekly_series(_data: Dict, username: str, today_iso: str) -> pd.Series:
+    return pd.Series(get_weekly_progress(_data, username, today_iso)).sort_index()
 
 # Authentication
-def authenticate_user() -> Optional[str]:
-    data = load_data()
+def authenticate_user(data: Dict) -> Optional[str]:
     with st.sidebar:
         if 'authenticated' not in st.session_state:
             st.subheader("User Login")
-            username = st.text_input("Username")
-            if st.button("Login/Create Account"):
-                if username:
-                    st.session_state.authenticated = username
-                    if username not in data["users"]:
-                        data["users"][username] = {"joined": datetime.date.today().isoformat()}
-                        save_data(data)
-                    st.rerun()
+            st.text_input("Username", key="login_username")
+            st.button("Login/Create Account", on_click=_login, args=(data,))
             return None
         else:
             st.subheader(f"Welcome, {st.session_state.authenticated}")
-            if st.button("Logout"):
-                del st.session_state.authenticated
-                st.rerun()
+            st.button("Logout", on_click=_logout)
             return st.session_state.authenticated
 
+def _login(data: Dict) -> None:
+    username = st.session_state.login_username
+    if username:
+        st.session_state.authenticated = username
+        if username not in data["users"]:
+            # Only marks the store dirty; the writer thread does the disk write
+            data["users"][username] = {"joined": datetime.date.today().isoformat()}
+            save_data(data)
+
+def _logout() -> None:
+    del st.session_state.authenticated
+
 # App Components
 def dashboard() -> None:
     st.header("🧠 Growth Mindset Dashboard")
     st.subheader("Daily Inspiration")
-    st.success(random.choice(GROWTH_QUOTES))
+    st.success(quote_of_day(datetime.date.today().isoformat()))
     
     with st.expander("📚 Growth Mindset Fundamentals"):
         col1, col2 = st.columns(2)
@@ -142,7 +301,7 @@ def dashboard() -> None:
         action_cols = st.columns(3)
         with action_cols[0]:
             if st.button("🎯 New Challenge"):
-                challenge_level = random.choice(list(DAILY_CHALLENGES.keys()))
+                challenge_level = random.choice(CHALLENGE_LEVELS)
                 st.session_state.current_challenge = random.choice(
                     DAILY_CHALLENGES[challenge_level]
                 )
@@ -150,9 +309,9 @@ def dashboard() -> None:
             if st.button("📝 Quick Journal"):
                 st.session_state.journal_quick_entry = True
 
-def daily_challenge(username: str) -> None:
+def daily_challenge(username: str, data: Dict) -> None:
     st.header("🔥 Daily Growth Challenge")
-    challenge_level = st.selectbox("Select Difficulty", list(DAILY_CHALLENGES.keys()))
+    challenge_level = st.selectbox("Select Difficulty", CHALLENGE_LEVELS)
     
     if st.button("Generate New Challenge"):
         challenge = random.choice(DAILY_CHALLENGES[challenge_level])
@@ -164,35 +323,38 @@ def daily_challenge(username: str) -> None:
             st.markdown(f"#### {st.session_state.current_challenge}")
             
             if st.button("Complete Challenge ✅"):
-                data = load_data()
-                data["completed_challenges"].append({
-                    "date": datetime.date.today().isoformat(),
+                today = datetime.date.today()
+                user = get_user_record(data, username)
+                new_challenge = {
+                    "date": today.isoformat(),
                     "challenge": st.session_state.current_challenge,
                     "user": username
-                })
+                }
+                data["completed_challenges"].append(new_challenge)
+                data["_challenges_by_user"][username].append(new_challenge)
+                update_streak(user, today)
                 save_data(data)
+                get_weekly_progress.clear()
+                weekly_series.clear()
                 st.success("Challenge completed! 🎉")
                 del st.session_state.current_challenge
                 st.rerun()
 
-def progress_tracker(username: str) -> None:
+def progress_tracker(username: str, data: Dict) -> None:
     st.header("📈 Progress Tracker")
-    data = load_data()
-    user_challenges = [c for c in data["completed_challenges"] if c["user"] == username]
+    user_challenges = get_user_challenges(data, username)
     
     # Metrics
     col1, col2, col3 = st.columns(3)
     col1.metric("Total Challenges", len(user_challenges))
-    col2.metric("Current Streak", calculate_streak([c["date"] for c in user_challenges]))
+    col2.metric("Current Streak", current_streak(get_user_record(data, username)))
     
     # Progress Visualization
     with st.expander("📊 Detailed Analytics"):
-        progress = get_weekly_progress()
-        st.bar_chart(progress)
+        st.bar_chart(weekly_series(data, username, datetime.date.today().isoformat()))
 
-def reflection_journal(username: str) -> None:
+def reflection_journal(username: str, data: Dict) -> None:
     st.header("📔 Reflection Journal")
-    data = load_data()
     
     with st.form("journal_entry"):
         entry_date = st.date_input("Entry Date", datetime.date.today())
@@ -211,34 +373,41 @@ def reflection_journal(username: str) -> None:
                 "tags": tags,
                 "user": username
             }
-            data["journal_entries"].append(new_entry)
+            new_entry["_lc"] = entry_search_text(new_entry)
+            new_entry["_tags_str"] = ", ".join(tags)
+            data["journal_entries"][new_entry["id"]] = new_entry
+            data["_entries_by_user"][username][new_entry["id"]] = new_entry
             save_data(data)
             st.success("Entry saved successfully!")
     
     with st.expander("📖 View Past Entries"):
-        search_query = st.text_input("Search Entries")
-        filtered_entries = [
-            e for e in data["journal_entries"]
-            if e["user"] == username and (
-                search_query.lower() in e["reflection"].lower() or
-                search_query.lower() in e["lessons"].lower()
-            )
-        ]
-        
-        for entry in reversed(filtered_entries):
-            st.markdown(f"**{entry['date']}** {entry['mood']}")
-            st.write(entry["reflection"])
-            st.caption(f"Lessons: {entry['lessons']}")
-            st.caption(f"Tags: {', '.join(entry['tags'])}")
-            if st.button(f"Delete {entry['id'][:8]}", key=f"del_{entry['id']}"):
-                data["journal_entries"] = [e for e in data["journal_entries"] if e["id"] != entry["id"]]
-                save_data(data)
-                st.rerun()
-            st.divider()
+        _render_entries(data, username)
+
+@st.fragment
+def _render_entries(data: Dict, username: str) -> None:
+    query = st.text_input("Search Entries").lower()
+    # Snapshot the values; other sessions may change the shared store mid-render
+    filtered_entries = [
+        e for e in list(get_user_entries(data, username).values())
+        if query in e["_lc"]
+    ]
+    
+    for entry in reversed(filtered_entries):
+        st.markdown(f"**{entry['date']}** {entry['mood']}")
+        st.write(entry["reflection"])
+        st.caption(f"Lessons: {entry['lessons']}")
+        st.caption(f"Tags: {entry['_tags_str']}")
+        st.button(f"Delete {entry['id'][:8]}", key=f"del_{entry['id']}",
+                  on_click=_delete_entry, args=(data, username, entry["id"]))
+        st.divider()
 
-def community_wall(username: str) -> None:
+def _delete_entry(data: Dict, username: str, entry_id: str) -> None:
+    data["journal_entries"].pop(entry_id, None)
+    data["_entries_by_user"][username].pop(entry_id, None)
+    save_data(data)
+
+def community_wall(username: str, data: Dict) -> None:
     st.header("🌍 Community Wisdom Wall")
-    data = load_data()
     
     with st.form("community_post"):
         post = st.text_area("Share your growth mindset experience")
@@ -248,31 +417,70 @@ def community_wall(username: str) -> None:
                 "date": datetime.datetime.now().isoformat(),
                 "content": post,
                 "author": username,
-                "likes": 0
+                "likes": 0,
+                "_lc": post.lower(),
+                "_ts": int(time.time())
             }
-            data["community_posts"].append(new_post)
+            data["community_posts"][new_post["id"]] = new_post
             save_data(data)
     
     st.subheader("Recent Community Posts")
-    search_query = st.text_input("Search Posts")
+    _render_posts(data, username)
+
+@st.fragment
+def _render_posts(data: Dict, username: str) -> None:
+    query = st.text_input("Search Posts", on_change=_set_posts_page, args=(0,)).lower()
+    page = st.session_state.setdefault("posts_page", 0)
     
-    for post in reversed(data["community_posts"]):
-        if search_query.lower() in post["content"].lower():
-            col1, col2 = st.columns([0.9, 0.1])
-            with col1:
-                st.markdown(f"**{post['author']}** ({post['date']})")
-                st.write(post["content"])
-            with col2:
-                st.markdown(f"❤️ {post['likes']}")
-                if st.button("👍", key=f"like_{post['id']}"):
-                    post["likes"] += 1
-                    save_data(data)
-                    st.rerun()
-            if post["author"] == username and st.button(f"Delete {post['id'][:8]}", key=f"del_{post['id']}"):
-                data["community_posts"] = [p for p in data["community_posts"] if p["id"] != post["id"]]
-                save_data(data)
-                st.rerun()
-            st.divider()
+    # Snapshot the values; other sessions may change the shared store mid-render
+    posts = list(data["community_posts"].values())
+    page_posts = _page_posts(posts, query, page)
+    if not page_posts and page > 0:
+        # A delete emptied the last page; move back to the last page with posts
+        total = sum(1 for p in posts if query in p["_lc"])
+        page = st.session_state.posts_page = max(0, (total - 1) // POSTS_PER_PAGE)
+        page_posts = _page_posts(posts, query, page)
+    has_older = len(page_posts) > POSTS_PER_PAGE
+    
+    for post in page_posts[:POSTS_PER_PAGE]:
+        col1, col2 = st.columns([0.9, 0.1])
+        with col1:
+            st.markdown(f"**{post['author']}** ({post['date']})")
+            st.write(post["content"])
+        with col2:
+            st.markdown(f"❤️ {post['likes']}")
+            st.button("👍", key=f"like_{post['id']}",
+                      on_click=_like_post, args=(data, post["id"]))
+        if post["author"] == username:
+            st.button(f"Delete {post['id'][:8]}", key=f"del_{post['id']}",
+                      on_click=_delete_post, args=(data, post["id"]))
+        st.divider()
+    
+    prev_col, next_col = st.columns(2)
+    prev_col.button("⬅️ Newer", disabled=page == 0,
+                    on_click=_set_posts_page, args=(page - 1,))
+    next_col.button("Older ➡️", disabled=not has_older,
+                    on_click=_set_posts_page, args=(page + 1,))
+
+def _page_posts(posts: List[Dict], query: str, page: int) -> List[Dict]:
+    # Fetch one extra match to know whether an older page exists
+    matches = (p for p in reversed(posts) if query in p["_lc"])
+    start = page * POSTS_PER_PAGE
+    return list(islice(matches, start, start + POSTS_PER_PAGE + 1))
+
+def _set_posts_page(page: int) -> None:
+    st.session_state.posts_page = page
+
+def _like_post(data: Dict, post_id: str) -> None:
+    # The post may have been deleted from another session since the last render
+    post = data["community_posts"].get(post_id)
+    if post:
+        post["likes"] += 1
+        save_data(data)
+
+def _delete_post(data: Dict, post_id: str) -> None:
+    data["community_posts"].pop(post_id, None)
+    save_data(data)
 
 def resources() -> None:
     st.header("📚 Growth Resources")
@@ -298,34 +506,33 @@ def main():
         layout="wide"
     )
     
-    username = authenticate_user()
+    if "data" not in st.session_state:
+        st.session_state.data = load_data()
+    data = st.session_state.data
+    username = authenticate_user(data)
     if not username:
         return
     
     with st.sidebar:
         choice = option_menu(
             "Growth Mindset Lab",
-            ["Dashboard", "Daily Challenge", "Progress Tracker", 
-             "Reflection Journal", "Community Wall", "Resources"],
-            icons=['house', 'clock', 'graph-up', 'journal', 'people', 'book'],
+            MENU_OPTIONS,
+            icons=MENU_ICONS,
             menu_icon="brain",
             default_index=0,
-            styles={
-                "container": {"padding": "5px"},
-                "nav-link": {"font-size": "16px"}
-            }
+            styles=MENU_STYLES
         )
     
     if choice == "Dashboard":
         dashboard()
     elif choice == "Daily Challenge":
-        daily_challenge(username)
+        daily_challenge(username, data)
     elif choice == "Progress Tracker":
-        progress_tracker(username)
+        progress_tracker(username, data)
     elif choice == "Reflection Journal":
-        reflection_journal(username)
+        reflection_journal(username, data)
     elif choice == "Community Wall":
-        community_wall(username)
+        community_wall(username, data)
     elif choice == "Resources":
         resources()
 